@@ -5,21 +5,29 @@ RUN:
     python app.py
 then browse to http://localhost:5006/sim
 """
+import numpy as np
 from bokeh.layouts import column, row
 from bokeh.models import ColumnDataSource, Div
 from bokeh.plotting import curdoc, figure
 from bokeh.server.server import Server
 
-from generator import start_sim, get_vitals
+from generator import start_sim, get_vitals, WAVE_LEN
 
 # ---------- initialise shared data sources ----------------------------
-src_numbers = ColumnDataSource(dict(
-    labels=["HR","SBP","DBP","MAP","SpO₂","ICP"],
-    values=["--"]*6,
-))
+# (banner label, vitals key, format) – read straight off get_vitals()
+NUMBERS = [
+    ("HR",   "HR",   "{:.0f}"),
+    ("SBP",  "SBP",  "{:.0f}"),
+    ("DBP",  "DBP",  "{:.0f}"),
+    ("MAP",  "MAP",  "{:.0f}"),
+    ("SpO₂", "SpO2", "{:.1f}"),
+    ("ICP",  "ICP",  "{:.1f}"),
+]
 
-src_abp = ColumnDataSource(dict(x=list(range(300)), y=[0]*300))
-src_icp = ColumnDataSource(dict(x=list(range(300)), y=[0]*300))
+# x is the generator's sample index; start with a flat 300‑sample history
+src_abp = ColumnDataSource(dict(x=np.arange(-WAVE_LEN, 0), y=np.zeros(WAVE_LEN, dtype=np.float32)))
+src_icp = ColumnDataSource(dict(x=np.arange(-WAVE_LEN, 0), y=np.zeros(WAVE_LEN, dtype=np.float32)))
+_last_n = 0          # n_samples already streamed to the sources
 
 # ---------- build UI ---------------------------------------------------
 title = Div(text="<h1 style='color:#004d80'>Pulse‑Driven Neuro Monitor</h1>")
@@ -40,24 +48,21 @@ layout = column(title, numbers_html, wave_abp, wave_icp)
 
 # ---------- periodic callback -----------------------------------------
 def update():
-    vit = get_vitals()
+    global _last_n
+    vit = get_vitals(since=_last_n)
 
     # Update numeric banner
-    src_numbers.data["values"] = [
-        f"{vit['HR']:.0f}",
-        f"{vit['SBP']:.0f}",
-        f"{vit['DBP']:.0f}",
-        f"{vit['MAP']:.0f}",
-        f"{vit['SpO2']:.1f}",
-        f"{vit['ICP']:.1f}",
-    ]
     numbers_html.text = "  ".join(
-        f"<b>{lab}</b>: {val}" for lab,val in zip(src_numbers.data["labels"], src_numbers.data["values"])
+        f"<b>{lab}</b>: {fmt.format(vit[key])}" for lab,key,fmt in NUMBERS
     )
 
-    # Update waveforms
-    src_abp.data.update(y=vit["ABP_wave"])
-    src_icp.data.update(y=vit["ICP_wave"])
+    # Update waveforms – stream only the samples since the last poll
+    n, new = vit["n_samples"], len(vit["ABP_wave"])
+    if new:
+        x = np.arange(n - new, n)
+        src_abp.stream(dict(x=x, y=vit["ABP_wave"]), rollover=WAVE_LEN)
+        src_icp.stream(dict(x=x, y=vit["ICP_wave"]), rollover=WAVE_LEN)
+    _last_n = n
 
 def sim_app(doc):
     start_sim()                         # kicks off Pulse thread
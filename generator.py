@@ -9,30 +9,45 @@ USAGE (from app.py):
     vitals = get_vitals()
 """
 import threading, time, math
-from collections import deque
+
+import numpy as np
 
 # ---------- Pulse Physiology Engine ------------------------------------
 # Install once in your venv:  pip install git+https://gitlab.kitware.com/physiology/engine.git
 from pulse.engine import PulseEngine
 
-# Public dictionary updated every 100 ms
-_latest = {
+# Latest scalars – the producer swaps in a fresh dict each step, so
+# readers always see one consistent set without locking
+_scalars = {
     "HR": 0,  "SBP": 0,  "DBP": 0, "MAP": 0,
     "SpO2": 0, "ICP": 0,
-    "ABP_wave": deque(maxlen=300),   # 3 s at 100 Hz
-    "ICP_wave": deque(maxlen=300),
 }
 
+# Waveform ring buffers.  _n_samples is the write index: the producer
+# fills slot _n_samples & _MASK first and only then bumps the counter.
+WAVE_LEN = 300                       # 3 s at 100 Hz handed to callers
+_RING = 512                          # power of two ≥ WAVE_LEN, with slack
+_MASK = _RING - 1                    # so the writer never laps a reader
+_abp_ring = np.zeros(_RING, dtype=np.float32)
+_icp_ring = np.zeros(_RING, dtype=np.float32)
+_n_samples = 0                       # total waveform samples produced
+
+_BPM_TO_RAD_S = 2*math.pi/60.0      # heart rate (bpm) → angular frequency
+
 _RUN_FLAG = False
+_START_LOCK = threading.Lock()       # several sessions may call start_sim()
 
 def _pulse_thread():
-    """Advance Pulse in real time and refresh _latest."""
+    """Advance Pulse in real time and publish the latest vitals."""
+    global _scalars, _n_samples
     engine = PulseEngine()
     engine.initialize_patient("StandardMale.json")
     dt = 0.01          # 100 Hz simulation
-    t0 = time.time()
+    max_late = 10*dt   # catch up at most 10 steps (100 ms) in one burst
+    t0 = next_t = time.monotonic()
 
     while _RUN_FLAG:
+        next_t += dt       # fixed deadlines: no drift from sleep jitter
         engine.advance_time_s(dt)
 
         # Scalars
@@ -44,36 +59,66 @@ def _pulse_thread():
         sbp, dbp = map_ + 20, map_ - 20        # crude pulse pressure
 
         # Synthetic waveforms (simple beats around mean values)
-        f = hr / 60.0                  # Hz
-        t = time.time() - t0
-        abp_val = map_ + (sbp - dbp)/2 * math.sin(2*math.pi*f*t)
-        icp_val = icp  + 2 * math.sin(2*math.pi*f*t)
+        t = next_t - t0
+        beat = math.sin(_BPM_TO_RAD_S * hr * t)
+        abp_val = map_ + (sbp - dbp)/2 * beat
+        icp_val = icp  + 2 * beat
 
-        # Atomically update shared dict
-        _latest.update(dict(
+        # Publish: write the ring slot, then swap scalars and bump the index
+        w = _n_samples & _MASK
+        _abp_ring[w] = abp_val
+        _icp_ring[w] = icp_val
+        _scalars = dict(
             HR=hr, SBP=sbp, DBP=dbp, MAP=map_,
             SpO2=spo2, ICP=icp,
-        ))
-        _latest["ABP_wave"].append(abp_val)
-        _latest["ICP_wave"].append(icp_val)
+        )
+        _n_samples += 1
 
-        time.sleep(dt)
+        # Sleep until the next deadline.  When late, still yield the GIL
+        # once, then run the missed steps back to back – but only up to
+        # max_late, past which the backlog is dropped and we resync
+        delay = next_t - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            time.sleep(0)
+            if delay < -max_late:
+                next_t = time.monotonic()
 
 def start_sim():
     """Call once from app.py; safe to call repeatedly."""
     global _RUN_FLAG
-    if not _RUN_FLAG:
-        _RUN_FLAG = True
-        threading.Thread(target=_pulse_thread, daemon=True).start()
+    with _START_LOCK:
+        if not _RUN_FLAG:
+            _RUN_FLAG = True
+            threading.Thread(target=_pulse_thread, daemon=True).start()
 
 def stop_sim():
     global _RUN_FLAG
     _RUN_FLAG = False
 
-def get_vitals():
-    """Return a *copy* of the latest vitals dict."""
-    data = _latest.copy()
-    # make true copies of the deques so caller can iterate safely
-    data["ABP_wave"] = list(_latest["ABP_wave"])
-    data["ICP_wave"] = list(_latest["ICP_wave"])
+def _ring_tail(ring, n, k):
+    """Copy the k samples ending at write index n out of *ring*."""
+    lo, hi = (n - k) & _MASK, n & _MASK
+    if lo <= hi:
+        return ring[lo:hi].copy()
+    return np.concatenate((ring[lo:], ring[:hi]))
+
+def get_vitals(since=None):
+    """Return a *copy* of the latest vitals dict.
+
+    Waveforms come back as float32 NumPy arrays (at most WAVE_LEN
+    samples) so Bokeh can ship them over its binary buffer protocol
+    instead of as JSON lists.  Pass ``since=`` the ``n_samples`` of a
+    previous call to get only the samples produced after it; a cursor
+    ahead of the generator (e.g. after a module reload) starts afresh.
+    """
+    n = _n_samples                   # samples below n are fully written
+    if since is None or since > n:
+        since = 0
+    k = min(n - since, WAVE_LEN)
+    data = dict(_scalars)
+    data["ABP_wave"] = _ring_tail(_abp_ring, n, k)
+    data["ICP_wave"] = _ring_tail(_icp_ring, n, k)
+    data["n_samples"] = n
     return data
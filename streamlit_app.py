@@ -1,40 +1,61 @@
 # streamlit_app.py  ── Streamlit front‑end that consumes generator.py
 import streamlit as st, numpy as np, time
 from threading import Thread
-from collections import deque
 from generator import start_sim, get_vitals
 
 # ----- kick off the Pulse engine in the background --------------------
-start_sim()
+# One engine per server process, shared read‑only by every browser tab
+@st.cache_resource(show_spinner=False)
+def _shared_sim():
+    start_sim()
+
+_shared_sim()
 
 # ----- Streamlit page config & placeholders ---------------------------
 st.set_page_config("Pulse‑Driven Monitor", layout="wide")
 st.title("🩺 Neuro‑oriented Vitals Monitor (all Python)")
 
-place_tiles = st.columns(6)
+place_tiles = [c.empty() for c in st.columns(6)]   # one slot per tile
 labels = ["HR (bpm)", "SBP (mmHg)", "DBP (mmHg)",
           "MAP (mmHg)", "SpO₂ (%)", "ICP (mmHg)"]
-
-# 8‑second rolling waveforms at 20 Hz UI refresh
-BUF = 160
-abp_buf = deque([0.0]*BUF, maxlen=BUF)
-icp_buf = deque([0.0]*BUF, maxlen=BUF)
-wf_abp = st.line_chart(np.zeros(BUF))
-wf_icp = st.line_chart(np.zeros(BUF))
+TILE_PERIOD = 0.5           # s – numbers refresh at 2 Hz, waveforms at 20 Hz
+shown = [None]*6            # text last rendered in each tile
+last_tile_t = 0.0
+
+# Waveforms: each tick appends only the samples produced since the
+# previous one.  add_rows() has no rollover, so every CHART_RESET_S the
+# charts are re‑created from the generator's last WAVE_LEN samples,
+# keeping each trace at 3–13 s instead of growing all session
+CHART_RESET_S = 10.0
+slot_abp, slot_icp = st.empty(), st.empty()
+last_reset_t = float("-inf")        # seed the charts on the first tick
+last_n = 0
 
 # ----- live update loop ------------------------------------------------
 while True:
-    v = get_vitals()          # dict from generator.py
-
-    # Update numeric tiles
-    values = [v["HR"], v["SBP"], v["DBP"], v["MAP"], v["SpO2"], v["ICP"]]
-    for col, lab, val in zip(place_tiles, labels, values):
-        col.metric(lab, f"{val:.1f}" if lab.startswith("SpO") else f"{val:.0f}")
-
-    # Update waveforms
-    abp_buf.extend(v["ABP_wave"][-1:])
-    icp_buf.extend(v["ICP_wave"][-1:])
-    wf_abp.add_rows(np.array(abp_buf).reshape(-1,1))
-    wf_icp.add_rows(np.array(icp_buf).reshape(-1,1))
+    now = time.monotonic()
+    reseed = now - last_reset_t >= CHART_RESET_S
+    # dict from generator.py: full window when reseeding, else new samples
+    v = get_vitals() if reseed else get_vitals(since=last_n)
+    last_n = v["n_samples"]
+
+    # Update numeric tiles at TILE_PERIOD, and only the ones that changed
+    if now - last_tile_t >= TILE_PERIOD:
+        last_tile_t = now
+        values = [v["HR"], v["SBP"], v["DBP"], v["MAP"], v["SpO2"], v["ICP"]]
+        for i, (tile, lab, val) in enumerate(zip(place_tiles, labels, values)):
+            text = f"{val:.1f}" if lab.startswith("SpO") else f"{val:.0f}"
+            if text != shown[i]:
+                tile.metric(lab, text)
+                shown[i] = text
+
+    # Update waveforms (float32 throughout – add_rows() must match the seed)
+    if reseed:
+        last_reset_t = now
+        wf_abp = slot_abp.line_chart(v["ABP_wave"].reshape(-1,1))
+        wf_icp = slot_icp.line_chart(v["ICP_wave"].reshape(-1,1))
+    elif len(v["ABP_wave"]):
+        wf_abp.add_rows(v["ABP_wave"].reshape(-1,1))
+        wf_icp.add_rows(v["ICP_wave"].reshape(-1,1))
 
     time.sleep(0.05)          # 20 Hz UI refresh